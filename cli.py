@@ -0,0 +1,425 @@
+"""
+Headless batch processing entry point.
+
+Usage:
+    python cli.py --repo user/repo --model models/model.pth --pattern "data/*.pt" --workers 4
+    python cli.py --repo user/repo --model models/model.pth --pattern "data/**/*.pt" \
+        --colab-url https://xxxx.ngrok.io --colab-url https://yyyy.ngrok.io
+
+--pattern is matched against repository paths; "*" stays within one directory
+and "**" matches any number of directories. Each input's output is written to
+--output-folder under the input's path relative to the pattern's literal
+prefix, e.g. data/a/x.pt -> results/a/x_decompressed.pt. --processing-type
+only applies to Colab runs.
+
+The checkpoint records the run parameters (repo, model and its sha, output
+folder, input root, processing type); resuming with different parameters is
+refused unless --reset-checkpoint is given.
+
+Colab server contract (--colab-url):
+    POST /submit_job receives the job built by ColabServerClient.submit_job.
+    Its processing_config carries "output_folder" and "output_name"; the
+    server must commit the result to <output_folder>/<output_name> in
+    github_repo. A job is recorded as "submitted" and moves to "done" once a
+    commit touching that path lands after the submission time, or to "failed"
+    after --job-timeout.
+"""
+import argparse
+import fnmatch
+import io
+import json
+import os
+import posixpath
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from itertools import count
+from typing import Callable, Optional, Dict, List, Tuple
+
+import requests
+
+from config.logging_config import logger
+from config.settings import DATA_FOLDER, RESULTS_FOLDER, PROCESSING_TYPES
+from services.github_storage import GitHubStorage
+
+DEFAULT_CHECKPOINT = ".batch_checkpoint.json"
+GLOB_CHARS = "*?["
+STATES = ("done", "submitted", "failed")
+
+
+# ---- Checkpoint ----
+def load_checkpoint(path: str) -> Dict:
+    data = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    for state in STATES:
+        data.setdefault(state, {})
+    return data
+
+
+def save_checkpoint(path: str, data: Dict) -> None:
+    """途中で中断されても壊れないよう一時ファイル経由で書き込む"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def run_params(args, model_info: Dict, input_root: str) -> Dict:
+    """チェックポイントの再利用可否を判定するための実行パラメータ"""
+    return {
+        "repo": args.repo,
+        "model": args.model,
+        "model_sha": model_info.get("sha", ""),
+        "output_folder": args.output_folder.strip("/"),
+        "input_root": input_root,
+        "processing_type": args.processing_type,
+    }
+
+
+def _has_state(checkpoint: Dict, state: str, file_info: Dict) -> bool:
+    return checkpoint[state].get(file_info["path"], {}).get("sha") == file_info["sha"]
+
+
+def _set_state(checkpoint: Dict, state: str, file_info: Dict, **extra) -> None:
+    """ファイルを指定した状態に移す（他の状態からは取り除く）"""
+    for other in STATES:
+        checkpoint[other].pop(file_info["path"], None)
+    checkpoint[state][file_info["path"]] = {
+        "sha": file_info["sha"],
+        f"{state}_at": datetime.now().isoformat(),
+        **extra,
+    }
+
+
+def record_done(checkpoint: Dict, file_info: Dict, **extra) -> None:
+    _set_state(checkpoint, "done", file_info, **extra)
+    logger.info(f"Done: {file_info['path']}")
+
+
+def record_submitted(checkpoint: Dict, file_info: Dict, **extra) -> None:
+    _set_state(checkpoint, "submitted", file_info, **extra)
+    logger.info(f"Submitted: {file_info['path']} ({extra.get('job_id')})")
+
+
+def record_failed(checkpoint: Dict, file_info: Dict, error) -> None:
+    _set_state(checkpoint, "failed", file_info, error=str(error))
+    logger.error(f"Failed: {file_info['path']}: {error}")
+
+
+# ---- Input selection ----
+def _glob_match(parts: List[str], patterns: List[str]) -> bool:
+    if not patterns:
+        return not parts
+    if patterns[0] == "**":
+        return any(_glob_match(parts[i:], patterns[1:]) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatch.fnmatchcase(parts[0], patterns[0]) and _glob_match(parts[1:], patterns[1:])
+
+
+def literal_prefix(pattern: str) -> str:
+    """ワイルドカードを含まない先頭のフォルダ部分"""
+    prefix = []
+    for part in pattern.strip("/").split("/")[:-1]:
+        if any(c in part for c in GLOB_CHARS):
+            break
+        prefix.append(part)
+    return "/".join(prefix)
+
+
+def match_files(storage: GitHubStorage, pattern: str) -> List[Dict]:
+    """パターンに一致するファイルを、先頭フォルダ以下のツリーから選ぶ"""
+    patterns = pattern.strip("/").split("/")
+    files, truncated = storage.list_tree(literal_prefix(pattern), recursive=True)
+    if truncated:
+        logger.warning("Repository tree listing was truncated; some inputs may be missing")
+    return [f for f in files if _glob_match(f["path"].split("/"), patterns)]
+
+
+def output_path_for(file_info: Dict, input_root: str, output_folder: str) -> str:
+    """入力の input_root からの相対パスを出力フォルダ以下に写す"""
+    relative = posixpath.relpath(file_info["path"], input_root) if input_root else file_info["path"]
+    folder, name = posixpath.split(relative)
+    stem = posixpath.splitext(name)[0]
+    return posixpath.join(output_folder.strip("/"), folder, f"{stem}_decompressed.pt")
+
+
+def find_collisions(outputs: Dict[str, str]) -> Dict[str, List[str]]:
+    """同じ出力パスに書き込む入力を検出（例: x.pt と x.pth）"""
+    by_output: Dict[str, List[str]] = {}
+    for path, output in outputs.items():
+        by_output.setdefault(output, []).append(path)
+    return {output: paths for output, paths in by_output.items() if len(paths) > 1}
+
+
+# ---- Executor helper ----
+def _run_pool(executor, submit: Callable, files: List[Dict], handle: Callable, args,
+              checkpoint: Dict, window: int, wait_running: bool) -> None:
+    """
+    同時に投入するタスクを window 件までに抑え、完了したものから handle に渡してチェックポイントを保存する。
+    Ctrl-C の場合は未着手のタスクを取り消し、完了済み（wait_running なら実行中も）を記録してから再送出する。
+    """
+    remaining = iter(files)
+    in_flight = {}
+
+    def fill() -> None:
+        for file_info in remaining:
+            in_flight[submit(file_info)] = file_info
+            if len(in_flight) >= window:
+                return
+
+    try:
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                handle(in_flight.pop(future), future)
+            save_checkpoint(args.checkpoint, checkpoint)
+            fill()
+    except KeyboardInterrupt:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if wait_running:
+            wait([f for f in in_flight if not f.cancelled()])
+        for future, file_info in in_flight.items():
+            if future.done() and not future.cancelled():
+                handle(file_info, future)
+        save_checkpoint(args.checkpoint, checkpoint)
+        raise
+    executor.shutdown()
+
+
+# ---- Local process pool ----
+_worker_storage: Optional[GitHubStorage] = None
+_worker_model = None
+
+
+def _init_worker(token: str, repo: str, model_bytes: bytes) -> None:
+    """プロセスごとに一度だけモデルと GitHub クライアントを初期化"""
+    global _worker_storage, _worker_model
+    from services.model_service import load_model_from_pth
+
+    # Ctrl-C は親プロセスで処理する
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_storage = GitHubStorage(token, repo)
+    _worker_model = load_model_from_pth(model_bytes)
+
+
+def _process_local(file_info: Dict) -> bytes:
+    import torch
+    from services.model_service import decompress_file
+
+    compressed_bytes = _worker_storage.download_file(file_info)
+    if compressed_bytes is None:
+        raise RuntimeError(f"Download failed: {file_info['path']}")
+
+    with torch.no_grad():
+        x_hat = decompress_file(_worker_model, compressed_bytes)
+
+    buffer = io.BytesIO()
+    torch.save(x_hat, buffer)
+    return buffer.getvalue()
+
+
+def run_local(storage: GitHubStorage, args, model_info: Dict, files: List[Dict],
+              outputs: Dict[str, str], checkpoint: Dict) -> None:
+    model_bytes = storage.download_file(model_info)
+    if model_bytes is None:
+        raise RuntimeError(f"Model download failed: {model_info['path']}")
+
+    def handle(file_info: Dict, future) -> None:
+        # 同じブランチへの並行コミットは 409 になりやすいため、アップロードは親プロセスで順番に行う
+        output = outputs[file_info["path"]]
+        try:
+            folder, name = posixpath.split(output)
+            if not storage.upload_file(future.result(), name, folder=folder):
+                raise RuntimeError(f"Upload failed: {output}")
+            record_done(checkpoint, file_info, output=output)
+        except Exception as e:
+            record_failed(checkpoint, file_info, e)
+
+    workers = args.workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(args.token, args.repo, model_bytes))
+    _run_pool(executor, lambda f: executor.submit(_process_local, f), files, handle, args,
+              checkpoint, window=2 * workers, wait_running=False)
+
+
+# ---- Remote Colab fan-out ----
+def run_remote(storage: GitHubStorage, args, model_info: Dict, files: List[Dict],
+               outputs: Dict[str, str], checkpoint: Dict) -> None:
+    from services.colab_client import ColabServerClient
+
+    # 前回投入済みのジョブは再投入せず、出力の確認だけ行う
+    to_submit = [f for f in files if not _has_state(checkpoint, "submitted", f)]
+
+    if to_submit:
+        clients = []
+        for i, url in enumerate(args.colab_url):
+            client = ColabServerClient()
+            if client.add_server(f"server_{i + 1}", url):
+                clients.append(client)
+        if not clients:
+            raise RuntimeError("No healthy Colab server available")
+
+        github_config = {"repo": args.repo, "token": args.token}
+
+        def submit_job(client: ColabServerClient, file_info: Dict) -> Tuple[Optional[str], Optional[str], str]:
+            folder, name = posixpath.split(outputs[file_info["path"]])
+            processing_config = {
+                "type": args.processing_type,
+                "model_file": model_info,
+                "output_folder": folder,
+                "output_name": name,
+            }
+            # 投入前の時刻を記録し、これ以降のコミットを完了とみなす
+            submitted_utc = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            job_id, error = client.submit_job(github_config, file_info, processing_config)
+            return job_id, error, submitted_utc
+
+        def handle(file_info: Dict, future) -> None:
+            try:
+                job_id, error, submitted_utc = future.result()
+                if not job_id:
+                    raise RuntimeError(error)
+                record_submitted(checkpoint, file_info, job_id=job_id, output=outputs[file_info["path"]],
+                                 submitted_utc=submitted_utc)
+            except Exception as e:
+                record_failed(checkpoint, file_info, e)
+
+        # サーバーごとに round-robin で割り当て
+        workers = args.workers or len(clients)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        turn = count()
+        _run_pool(executor, lambda f: executor.submit(submit_job, clients[next(turn) % len(clients)], f),
+                  to_submit, handle, args, checkpoint, window=2 * workers, wait_running=True)
+
+    wait_for_outputs(storage, args, files, checkpoint)
+
+
+def wait_for_outputs(storage: GitHubStorage, args, files: List[Dict], checkpoint: Dict) -> None:
+    """投入済みジョブの出力が投入後にコミットされるまでポーリングする"""
+    waiting = [f for f in files if _has_state(checkpoint, "submitted", f)]
+    while waiting:
+        try:
+            existing, _ = storage.list_tree(args.output_folder, recursive=True)
+            existing_paths = {f["path"] for f in existing}
+            now = datetime.now()
+            for file_info in waiting:
+                entry = checkpoint["submitted"][file_info["path"]]
+                if (entry["output"] in existing_paths
+                        and storage.has_commit_since(entry["output"], entry["submitted_utc"])):
+                    record_done(checkpoint, file_info, job_id=entry["job_id"], output=entry["output"])
+                elif (now - datetime.fromisoformat(entry["submitted_at"])).total_seconds() > args.job_timeout:
+                    record_failed(checkpoint, file_info,
+                                  f"Timed out waiting for {entry['output']} (job {entry['job_id']})")
+        except requests.RequestException as e:
+            # 一時的な失敗は次回のポーリングで再試行
+            logger.warning(f"Failed to check outputs, retrying: {e}")
+        save_checkpoint(args.checkpoint, checkpoint)
+
+        waiting = [f for f in waiting if _has_state(checkpoint, "submitted", f)]
+        if waiting:
+            logger.info(f"Waiting for {len(waiting)} remote jobs")
+            time.sleep(args.poll_interval)
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value}")
+    return number
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Batch hologram decompression without Streamlit")
+    parser.add_argument("--repo", required=True, help="GitHub repository (e.g. user/repo)")
+    parser.add_argument("--token", default=os.environ.get("GITHUB_TOKEN"),
+                        help="GitHub token (default: $GITHUB_TOKEN)")
+    parser.add_argument("--model", required=True, help="Model file path in the repository")
+    parser.add_argument("--pattern", default=f"{DATA_FOLDER}/*.pt",
+                        help="Glob of input paths; '*' matches within a directory, '**' across directories")
+    parser.add_argument("--output-folder", default=RESULTS_FOLDER)
+    parser.add_argument("--workers", type=positive_int,
+                        help="Local processes (default: CPU count), or concurrent submissions "
+                             "with --colab-url (default: number of servers)")
+    parser.add_argument("--colab-url", action="append", default=[],
+                        help="Colab server URL; repeat to fan out across servers")
+    parser.add_argument("--processing-type", choices=PROCESSING_TYPES,
+                        help=f"Remote processing type (--colab-url only, default: {PROCESSING_TYPES[0]})")
+    parser.add_argument("--poll-interval", type=float, default=30.0,
+                        help="Seconds between checks for remote job outputs")
+    parser.add_argument("--job-timeout", type=float, default=3600.0,
+                        help="Seconds after submission before a remote job is marked failed")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--reset-checkpoint", action="store_true",
+                        help="Discard the existing checkpoint and start from scratch")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry files recorded as failed")
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("GitHub token is required (--token or $GITHUB_TOKEN)")
+    if args.processing_type and not args.colab_url:
+        parser.error("--processing-type only applies to remote runs (--colab-url)")
+    # ローカル処理は hologram_processing と同じ処理
+    args.processing_type = args.processing_type or PROCESSING_TYPES[0]
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    storage = GitHubStorage(args.token, args.repo)
+
+    model_info = storage.get_file_info_detailed(args.model)
+    if model_info is None:
+        logger.error(f"Model not found: {args.model}")
+        return 1
+
+    input_root = literal_prefix(args.pattern)
+    params = run_params(args, model_info, input_root)
+    checkpoint = load_checkpoint(args.checkpoint)
+    if args.reset_checkpoint:
+        checkpoint = {state: {} for state in STATES}
+    elif any(checkpoint[state] for state in STATES) and checkpoint.get("params") != params:
+        logger.error(f"Checkpoint {args.checkpoint} was written for different run parameters "
+                     f"({checkpoint.get('params')}); use --reset-checkpoint or another --checkpoint")
+        return 2
+    checkpoint["params"] = params
+
+    try:
+        matched = match_files(storage, args.pattern)
+    except requests.RequestException as e:
+        logger.error(f"Failed to list inputs for {args.pattern}: {e}")
+        return 1
+
+    outputs = {f["path"]: output_path_for(f, input_root, args.output_folder) for f in matched}
+    collisions = find_collisions(outputs)
+    if collisions:
+        for output, paths in collisions.items():
+            logger.error(f"Inputs {paths} would all be written to {output}")
+        return 2
+
+    files = [f for f in matched if not _has_state(checkpoint, "done", f)]
+    if not args.retry_failed:
+        files = [f for f in files if not _has_state(checkpoint, "failed", f)]
+
+    logger.info(f"{len(files)} files to process ({len(checkpoint['done'])} already done)")
+    if not files:
+        save_checkpoint(args.checkpoint, checkpoint)
+        return 0
+
+    try:
+        if args.colab_url:
+            run_remote(storage, args, model_info, files, outputs, checkpoint)
+        else:
+            run_local(storage, args, model_info, files, outputs, checkpoint)
+    except KeyboardInterrupt:
+        save_checkpoint(args.checkpoint, checkpoint)
+        logger.warning("Interrupted; finished files are saved to the checkpoint, the rest will run on resume")
+        return 130
+
+    return 1 if any(_has_state(checkpoint, "failed", f) for f in files) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
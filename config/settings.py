@@ -8,3 +8,7 @@ PROCESSING_TYPES = ["hologram_processing", "image_analysis", "custom_processing"
 
 DATA_FOLDER = "data"
 RESULTS_FOLDER = "results"
+
+# File browser
+FILE_BROWSER_PAGE_SIZES = [25, 50, 100]
+FILE_INDEX_TTL = 300  # seconds
@@ -0,0 +1,88 @@
+import time
+import logging
+from typing import Optional, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = {
+    "name": lambda f: f.get("name", "").lower(),
+    "size": lambda f: f.get("size", 0),
+    "sha": lambda f: f.get("sha", ""),
+}
+
+
+class FileIndex:
+    """
+    フォルダのファイル一覧をローカルに保持するインデックス。
+    GitHub API へのアクセスは refresh 時のみ行い、検索・ソート・ページングはローカルで処理する。
+    一覧は Git Trees API から構築する（Contents API は 1 フォルダ 1,000 件までしか返さないため）。
+    """
+
+    def __init__(self, storage, folder: str = "data", ttl: float = 300.0):
+        self.storage = storage
+        self.folder = folder
+        self.ttl = ttl
+        self.files: List[Dict] = []
+        self.loaded_at: Optional[float] = None
+        # GitHub 側で一覧が打ち切られた場合 True
+        self.truncated = False
+        # ソート済みリストのキャッシュ (sort_by, descending) -> List[Dict]
+        self._sorted: Dict[Tuple[str, bool], List[Dict]] = {}
+
+    def is_stale(self) -> bool:
+        if self.loaded_at is None:
+            return True
+        return time.time() - self.loaded_at > self.ttl
+
+    def invalidate(self) -> None:
+        """次回の query で一覧を取り直す"""
+        self.loaded_at = None
+
+    def refresh(self, force: bool = False) -> None:
+        """インデックスを再構築（TTL 内なら何もしない）。取得失敗時は例外を送出し、既存の一覧は保持する"""
+        if not force and not self.is_stale():
+            return
+        self.files, self.truncated = self.storage.list_tree(self.folder)
+        self.loaded_at = time.time()
+        self._sorted.clear()
+        logger.info(f"File index refreshed: {self.folder} ({len(self.files)} files)")
+
+    def remove(self, path: str) -> None:
+        """削除済みファイルをインデックスから取り除く"""
+        self.files = [f for f in self.files if f.get("path") != path]
+        self._sorted.clear()
+
+    def _sorted_files(self, sort_by: str, descending: bool) -> List[Dict]:
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort_by}")
+        key = (sort_by, descending)
+        if key not in self._sorted:
+            self._sorted[key] = sorted(self.files, key=SORT_KEYS[sort_by], reverse=descending)
+        return self._sorted[key]
+
+    def query(self, search: str = "", extensions: Optional[List[str]] = None,
+              sort_by: str = "name", descending: bool = False,
+              page: int = 1, page_size: int = 50) -> Tuple[List[Dict], int, int]:
+        """
+        検索・拡張子フィルタ・ソートを適用し、(指定ページ分のファイル, 総件数, 実際のページ番号) を返す
+        ページ番号は 1 〜 最終ページの範囲に丸める
+        """
+        self.refresh()
+
+        files = self._sorted_files(sort_by, descending)
+
+        search = search.strip().lower()
+        if search:
+            files = [f for f in files
+                     if search in f.get("name", "").lower() or search in f.get("sha", "").lower()]
+
+        if extensions:
+            exts = [ext.lower() for ext in extensions]
+            files = [f for f in files if any(f.get("name", "").lower().endswith(ext) for ext in exts)]
+
+        total = len(files)
+        page_size = max(1, page_size)
+        num_pages = max(1, (total + page_size - 1) // page_size)
+        page = min(max(1, page), num_pages)
+        start = (page - 1) * page_size
+        return files[start:start + page_size], total, page
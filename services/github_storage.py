@@ -1,8 +1,10 @@
 import requests
+import posixpath
 import base64
 import logging
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+from urllib.parse import quote
 from github import Github
 import streamlit as st
 
@@ -84,7 +86,69 @@ class GitHubStorage:
             logger.error(f"Error listing files: {e}")
             st.error(f"ファイル一覧取得エラー: {e}")
             return []
-    
+
+    def list_tree(self, folder: str = "data", recursive: bool = False) -> Tuple[List[Dict], bool]:
+        """
+        Git Trees API でファイル一覧を取得 - Contents API の 1,000 件制限を受けない
+        指定フォルダのツリーだけを取得し、recursive=True の場合のみサブフォルダも含める。
+        戻り値は (ファイル一覧, truncated)。truncated が True の場合は一覧が不完全。
+        フォルダが存在しない場合は空の一覧を返し、それ以外の取得失敗は requests.RequestException を送出する。
+        """
+        branch = self.repository.default_branch
+        folder = folder.strip("/")
+        tree_ish = f"{branch}:{folder}" if folder else branch
+        url = f"{self.base_url}/git/trees/{quote(tree_ish, safe='/:')}"
+        if recursive:
+            url += "?recursive=1"
+        response = requests.get(url, headers=self.headers, timeout=60)
+
+        if response.status_code == 404:
+            logger.warning(f"Folder '{folder}' not found")
+            return [], False
+        if response.status_code != 200:
+            logger.error(f"Failed to list tree: {response.status_code}")
+            raise requests.HTTPError(f"Failed to list tree '{folder}': {response.status_code}", response=response)
+
+        data = response.json()
+        truncated = bool(data.get("truncated", False))
+        if truncated:
+            logger.warning(f"Tree listing truncated by GitHub API: {folder}")
+
+        files = []
+        for entry in data.get("tree", []):
+            # ファイル（blob）のみ処理
+            if entry.get("type") != "blob":
+                continue
+
+            # ツリー内のパスはフォルダからの相対パス
+            path = posixpath.join(folder, entry.get("path", "")) if folder else entry.get("path", "")
+            files.append({
+                "name": posixpath.basename(path),
+                "size": entry.get("size", 0),
+                "download_url": f"https://raw.githubusercontent.com/{self.repo}/{branch}/{path}",
+                "sha": entry.get("sha", ""),
+                "path": path,
+                "type": "file",
+                "encoding": "unknown",
+                "url": f"{self.base_url}/contents/{path}"
+            })
+
+        return files, truncated
+
+    def has_commit_since(self, file_path: str, since: str) -> bool:
+        """
+        指定時刻（ISO 8601, UTC）以降に file_path を変更したコミットがあるか
+        取得失敗時は requests.RequestException を送出する。
+        """
+        url = f"{self.base_url}/commits"
+        params = {"path": file_path, "since": since, "per_page": 1}
+        response = requests.get(url, headers=self.headers, params=params, timeout=30)
+        if response.status_code != 200:
+            logger.error(f"Failed to list commits: {response.status_code}")
+            raise requests.HTTPError(f"Failed to list commits for '{file_path}': {response.status_code}",
+                                     response=response)
+        return len(response.json()) > 0
+
     def download_file(self, file_info: Dict) -> Optional[bytes]:
         """
         ファイルをダウンロード - 段階的フォールバック方式
@@ -212,6 +276,36 @@ class GitHubStorage:
             logger.error(f"Upload error: {e}")
             return False
     
+    def delete_file(self, file_path: str, sha: Optional[str] = None,
+                    message: Optional[str] = None) -> bool:
+        """ファイルをGitHubから削除（Contents API の DELETE には blob の SHA が必要）"""
+        try:
+            url = f"{self.base_url}/contents/{file_path}"
+
+            if not sha:
+                check_response = requests.get(url, headers=self.headers, timeout=10)
+                if check_response.status_code != 200:
+                    logger.error(f"Delete failed, file not found: {file_path}")
+                    return False
+                sha = check_response.json()["sha"]
+
+            data = {
+                "message": message or f"Delete {posixpath.basename(file_path)} at {datetime.now().isoformat()}",
+                "sha": sha
+            }
+            response = requests.delete(url, json=data, headers=self.headers, timeout=60)
+
+            if response.status_code == 200:
+                logger.info(f"File deleted successfully: {file_path}")
+                return True
+            else:
+                logger.error(f"Delete failed: {response.status_code} - {response.text}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Delete error: {e}")
+            return False
+
     def get_file_info_detailed(self, file_path: str) -> Optional[Dict]:
         """ファイルの詳細情報を安全に取得"""
         try:
@@ -1,6 +1,5 @@
 import torch
 import io
-from services.github_storage import GithubStorage
 
 def load_model_from_pth(model_bytes):
     buffer = io.BytesIO(model_bytes)
@@ -1,4 +1,11 @@
 import streamlit as st
+from config.settings import DATA_FOLDER, FILE_BROWSER_PAGE_SIZES, FILE_INDEX_TTL
+from services.file_index import FileIndex
+
+
+def _reset_page():
+    st.session_state["fb_page"] = 1
+
 
 def file_management_ui():
     st.subheader("📂 File Management")
@@ -8,46 +15,91 @@ def file_management_ui():
         st.warning("⚠️ Please connect to GitHub first.")
         return
 
+    index_key = "file_index_data"
+    index = st.session_state.get(index_key)
+    if index is None or index.storage is not github_client:
+        index = FileIndex(github_client, DATA_FOLDER, ttl=FILE_INDEX_TTL)
+        st.session_state[index_key] = index
+
     # Upload
     st.markdown("### Upload File")
     uploaded_file = st.file_uploader("Choose a file to upload")
     if uploaded_file and st.button("Upload to GitHub"):
         try:
-            github_client.upload_file(uploaded_file.name, uploaded_file.read())
-            st.success(f"Uploaded {uploaded_file.name}")
+            if github_client.upload_file(uploaded_file.read(), uploaded_file.name, folder=DATA_FOLDER):
+                index.invalidate()
+                st.success(f"Uploaded {uploaded_file.name}")
+            else:
+                st.error(f"Upload failed: {uploaded_file.name}")
         except Exception as e:
             st.error(f"Upload failed: {e}")
 
     st.divider()
 
     # List & Download & Delete
-    files = github_client.list_files("data")
-
-    if files:
-        for file_path in files:
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                st.write(file_path)
-            with col2:
-                if st.button("Download", key=f"dl_{file_path}"):
-                    try:
-                        content = github_client.download_file(file_path)
-                        st.download_button(
-                            label="Save File",
-                            data=content,
-                            file_name=file_path,
-                            mime="application/octet-stream",
-                            key=f"save_{file_path}"
-                        )
-                    except Exception as e:
-                        st.error(f"Download failed: {e}")
-            with col3:
-                if st.button("Delete", key=f"del_{file_path}"):
-                    try:
-                        github_client.delete_file(file_path)
+    col_search, col_sort, col_order, col_refresh = st.columns([3, 1, 1, 1])
+    with col_search:
+        search = st.text_input("Search", key="fb_search", placeholder="name or sha",
+                               on_change=_reset_page)
+    with col_sort:
+        sort_by = st.selectbox("Sort by", ["name", "size", "sha"], key="fb_sort",
+                               on_change=_reset_page)
+    with col_order:
+        descending = st.selectbox("Order", ["asc", "desc"], key="fb_order",
+                                  on_change=_reset_page) == "desc"
+    with col_refresh:
+        if st.button("Refresh", key="fb_refresh"):
+            index.invalidate()
+
+    page_size = st.selectbox("Files per page", FILE_BROWSER_PAGE_SIZES, index=1, key="fb_page_size",
+                             on_change=_reset_page)
+
+    try:
+        files, total, page = index.query(search, sort_by=sort_by, descending=descending,
+                                         page=st.session_state.get("fb_page", 1), page_size=page_size)
+    except Exception as e:
+        st.error(f"Failed to list files: {e}")
+        return
+
+    if index.truncated:
+        st.warning("⚠️ GitHub truncated the file listing; some files may be missing.")
+
+    if total == 0:
+        st.info("No files found in repository.")
+        return
+
+    # ウィジェット生成前に丸めたページ番号を反映
+    st.session_state["fb_page"] = page
+    num_pages = (total + page_size - 1) // page_size
+    st.number_input(f"Page (1-{num_pages})", min_value=1, max_value=num_pages, step=1, key="fb_page")
+    st.caption(f"{total:,} files")
+
+    for file_info in files:
+        file_path = file_info["path"]
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            st.write(f"{file_info['name']} ({file_info['size']:,} bytes)")
+        with col2:
+            if st.button("Download", key=f"dl_{file_path}"):
+                try:
+                    content = github_client.download_file(file_info)
+                    st.download_button(
+                        label="Save File",
+                        data=content,
+                        file_name=file_info["name"],
+                        mime="application/octet-stream",
+                        key=f"save_{file_path}"
+                    )
+                except Exception as e:
+                    st.error(f"Download failed: {e}")
+        with col3:
+            if st.button("Delete", key=f"del_{file_path}"):
+                try:
+                    if github_client.delete_file(file_path, sha=file_info["sha"]):
+                        index.remove(file_path)
                         st.success(f"Deleted {file_path}")
                         st.rerun()  # ✅ experimental_rerun の代わり
-                    except Exception as e:
-                        st.error(f"Delete failed: {e}")
-    else:
-        st.info("No files found in repository.")
+                    else:
+                        st.error(f"Delete failed: {file_path}")
+                except Exception as e:
+                    st.error(f"Delete failed: {e}")